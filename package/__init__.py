@@ -0,0 +1,4 @@
+from package.mission import Mission
+from package.expander import Expander
+
+__all__ = ["Mission", "Expander"]
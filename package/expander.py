@@ -0,0 +1,140 @@
+import os
+
+import package.index as blk_index
+from package.streaming import BATCH_SIZE, CHUNK_SIZE, iter_vehicle_fields
+from package.mission import Mission
+
+class Expander:
+    """
+    Copies a mission onto every selected vehicle of the class of vehicles the player uses.
+
+    Example:
+        mission = Mission.load("mission.blk")
+        Expander(mission).expand("export", "nation=germ caliber=75-105")
+    """
+    def __init__(self, mission: Mission, data_dir: str = os.path.join("data", "vehicles"), apply_all_mods: bool = False, batch_size: int = BATCH_SIZE, memory_budget: int = None, log=None):
+        """
+        Args:
+            mission (Mission): The mission to expand. It is patched in place for every vehicle and restored afterwards.
+            data_dir (str, optional): Directory holding one directory of vehicle .json files per class of vehicles. Defaults to `data/vehicles`.
+            apply_all_mods (bool, optional): Whether to add all available modifications to the player's vehicle. Defaults to False.
+            batch_size (int, optional): Number of vehicles read ahead per batch. Defaults to BATCH_SIZE.
+            memory_budget (int, optional): Memory budget in bytes. If tracemalloc is tracing, expanding stops with a MemoryError once it is exceeded. Defaults to None.
+            log (optional): Called with a message for every vehicle that is skipped or only partially patched. Defaults to None.
+
+        Raises:
+            ValueError: No valid class of vehicles for the player
+            LookupError: No path to the player unit
+        """
+        self.mission = mission
+        self.model_type, self.unit_path = mission.player_unit()
+        self.loc_name = mission.get(["mission_settings", "mission", "locName"])
+        self.vehicle_dir = os.path.join(data_dir, self.model_type)
+        self.apply_all_mods = apply_all_mods
+        self.batch_size = batch_size
+        self.memory_budget = memory_budget
+        self.log = log
+        self._index = None
+        self._patched = [self.unit_path + [key] for key in ["weapons", "unit_class", "applyAllMods", "bullets0", "bullets1", "bullets2", "bullets3"]]
+        self._patched.append(["mission_settings", "mission", "locName"])
+
+    @property
+    def index(self) -> dict:
+        """
+        Returns:
+            dict: The vehicle index of the player's class of vehicles, loaded on first use.
+        """
+        if self._index is None:
+            self._index = blk_index.load_index(self.vehicle_dir)
+        return self._index
+
+    def select(self, expr: str = "") -> list:
+        """
+        Select the vehicles matching a filter expression, see `package.index.parse_filter`.
+
+        Args:
+            expr (str, optional): Filter expression. Defaults to every vehicle.
+
+        Raises:
+            ValueError: Invalid filter expression
+
+        Returns:
+            list: The matching vehicle records.
+        """
+        return blk_index.select(self.index, expr)
+
+    def variants(self, selection: str | list = ""):
+        """
+        Patch the mission for every selected vehicle.
+
+        Every variant starts from the source mission, so fields a vehicle does not patch, such as the ammunition of a
+        vehicle without a known caliber, keep their original values. The source mission is restored when iteration stops.
+
+        Args:
+            selection (str | list, optional): Filter expression, or vehicle records as returned by `select`. Defaults to every vehicle.
+
+        Raises:
+            ValueError: Invalid filter expression
+            MemoryError: Memory budget exceeded
+
+        Yields:
+            tuple: mission name, Mission
+        """
+        records = self.select(selection) if isinstance(selection, str) else selection
+        original = self.mission.snapshot(self._patched)
+        try:
+            for record, fields in iter_vehicle_fields(self.vehicle_dir, records, self.batch_size, self.memory_budget):
+                vehicle = record["name"]
+                if fields["weapon"] is None:
+                    self._log(f"Found no weapon for unit: {vehicle} - Patcher will not make a mission for this vehicle...")
+                    continue
+
+                self.mission.restore(original)
+                if self.apply_all_mods:
+                    self.mission.set(self.unit_path + ["applyAllMods"], True)
+                self.mission.set(self.unit_path + ["weapons"], fields["weapon"])
+
+                if not record["caliber"]:
+                    self._log(f"No valid caliber found for {vehicle} - Patcher will not change ammo configuration for this vehicle...")
+                else:
+                    ammo_types = fields["ammo_types"]
+                    for i in range(0, 4):
+                        if self.mission.get(self.unit_path + [f"bulletsCount{i}"], 0) > 0 and i < len(ammo_types):
+                            self.mission.set(self.unit_path + [f"bullets{i}"], ammo_types[i])
+                        else:
+                            self.mission.set(self.unit_path + [f"bullets{i}"], '')
+
+                mission_name = f"{record['nation']} {vehicle} {self.loc_name}.blk"
+                self.mission.set(["mission_settings", "mission", "locName"], mission_name)
+                self.mission.set(self.unit_path + ["unit_class"], vehicle)
+                yield mission_name, self.mission
+        finally:
+            self.mission.restore(original)
+
+    def expand(self, export_dir: str, selection: str | list = "", chunk_size: int = CHUNK_SIZE) -> list:
+        """
+        Write a mission for every selected vehicle.
+
+        Args:
+            export_dir (str): Directory to write the missions to. Created if it does not exist.
+            selection (str | list, optional): Filter expression, or vehicle records as returned by `select`. Defaults to every vehicle.
+            chunk_size (int, optional): Number of characters buffered before writing. Defaults to CHUNK_SIZE.
+
+        Raises:
+            ValueError: Invalid filter expression
+            MemoryError: Memory budget exceeded
+
+        Returns:
+            list: Paths of the written missions.
+        """
+        os.makedirs(export_dir, exist_ok=True)
+        paths = []
+        for mission_name, mission in self.variants(selection):
+            path = os.path.join(export_dir, mission_name)
+            mission.dump(path, chunk_size)
+            paths.append(path)
+        return paths
+
+    def _log(self, message: str) -> None:
+        if self.log is not None:
+            self.log(message)
@@ -0,0 +1,297 @@
+from argparse import ArgumentParser
+from importlib import import_module
+from random import Random
+from string import ascii_letters, digits
+from time import perf_counter
+import sys
+
+import package.parse as blk_parser
+
+TYPES = ['i', 'r', 't', 'b', 'm', 'p2', 'p3', 'p4', 'block']
+KEY_CHARS = ascii_letters + digits + '_.'
+STRING_CHARS = ascii_letters + digits + ' _/.,:;=+-[]{}()!?#'
+
+def random_float(rng: Random) -> float:
+    """
+    Generate a float that is representable in a .blk file.
+
+    Args:
+        rng (Random): Random number generator.
+
+    Returns:
+        float: Integer valued, rounded, very small or very large float.
+    """
+    match rng.randrange(4):
+        case 0:
+            return float(rng.randint(-1000, 1000))
+        case 1:
+            return round(rng.uniform(-1000, 1000), rng.randint(1, 6))
+        case 2:
+            return rng.uniform(-1, 1) * 10 ** rng.randint(-12, -5)
+        case _:
+            return rng.uniform(-1, 1) * 10 ** rng.randint(16, 30)
+
+def random_value(rng: Random, _type: str):
+    """
+    Generate a value of the given .blk type.
+
+    Args:
+        rng (Random): Random number generator.
+        _type (str): .blk type, one of `i`, `r`, `t`, `b`, `m`, `p2`, `p3` or `p4`.
+
+    Returns:
+        The value as it is returned by the parser.
+    """
+    match _type:
+        case 'i':
+            return rng.randint(-2 ** 31, 2 ** 31 - 1)
+        case 'r':
+            return random_float(rng)
+        case 't':
+            return ''.join(rng.choice(STRING_CHARS) for _ in range(rng.randint(0, 24)))
+        case 'b':
+            return rng.random() < 0.5
+        case 'm':
+            return [[random_float(rng) for _ in range(3)] for _ in range(rng.randint(1, 4))]
+        case _:
+            return tuple(random_float(rng) for _ in range(int(_type[1])))
+
+def random_block(rng: Random, depth: int = 3, width: int = 8) -> list:
+    """
+    Generate a random list of (key, value) tuples, including nested blocks and duplicate keys.
+
+    Args:
+        rng (Random): Random number generator.
+        depth (int, optional): Maximum nesting depth. Defaults to 3.
+        width (int, optional): Maximum number of elements per block. Defaults to 8.
+
+    Returns:
+        list: The generated block.
+    """
+    result = []
+    for _ in range(rng.randint(0, width)):
+        if result and rng.random() < 0.2:
+            key = rng.choice(result)[0]
+        else:
+            key = ''.join(rng.choice(KEY_CHARS) for _ in range(rng.randint(1, 12)))
+
+        _type = rng.choice(TYPES if depth > 0 else TYPES[:-1])
+        if _type == 'block':
+            result.append((key, random_block(rng, depth - 1, width)))
+        else:
+            result.append((key, random_value(rng, _type)))
+    return result
+
+def render_block(rng: Random, data: list, level: int = 0) -> str:
+    """
+    Write a block as .blk text, randomly using the different spellings the format allows.
+
+    Unlike `parse_dict_to_blk`, the output varies whitespace, separators, boolean words and number formats,
+    and sometimes puts several `;`-separated values on one line or closes a block right after its last value.
+
+    Args:
+        rng (Random): Random number generator.
+        data (list): Block to write.
+        level (int, optional): Nesting level. Defaults to 0.
+
+    Returns:
+        str: The .blk text.
+    """
+    def number(v: float) -> str:
+        return str(int(v)) if v.is_integer() and abs(v) < 1e15 and rng.random() < 0.5 else repr(v)
+
+    def value(v) -> tuple:
+        if isinstance(v, bool):
+            return 'b', rng.choice(['yes', 'true'] if v else ['no', 'false'])
+        elif isinstance(v, int):
+            return 'i', str(v)
+        elif isinstance(v, float):
+            return 'r', number(v)
+        elif isinstance(v, str):
+            return 't', f'"{v}"'
+        elif isinstance(v, tuple):
+            return f'p{len(v)}', rng.choice([',', ', ']).join(number(i) for i in v)
+        else:
+            return 'm', '[' + ' '.join('[' + ','.join(number(i) for i in row) + ']' for row in v) + ']'
+
+    indent_str = rng.choice([' ', '  ', '\t']) * level
+    text = indent_str
+    last = None
+    for key, v in data:
+        if last == 'value':
+            text += rng.choice(['\n', ';', '; ', ';\n'])
+        elif last is not None:
+            text += rng.choice(['\n', ' '])
+        if last is not None and text.endswith('\n'):
+            text += indent_str
+
+        if isinstance(v, list) and all(isinstance(i, tuple) for i in v):
+            text += f'{key}{rng.choice(["", " "])}{{'
+            text += rng.choice(['\n', '']) + render_block(rng, v, level + 1)
+            text += rng.choice([f'\n{indent_str}}}', '}'])
+            last = 'block'
+        else:
+            _type, value_text = value(v)
+            eq = rng.choice(['=', ' = ', '= ', ' ='])
+            text += f'{key}:{rng.choice(["", " "])}{_type}{eq}{value_text}'
+            last = 'string' if _type == 't' else 'value'
+
+    if last == 'value' and rng.random() < 0.3:
+        text += ';'
+    return text
+
+def same(a, b) -> bool:
+    """
+    Compare two parsed values, also requiring equal types so that e.g. `i=1`, `r=1` and `b=yes` differ.
+
+    Args:
+        a: First value.
+        b: Second value.
+
+    Returns:
+        bool: Whether both values are identical.
+    """
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    return a == b
+
+def reference_engine():
+    """
+    The parser/serializer pair of `package.parse`, which every other engine is compared against.
+
+    Returns:
+        tuple: parse function, serialize function
+    """
+    return blk_parser.parse_blk_to_dict, blk_parser.parse_dict_to_blk
+
+def load_engine(name: str):
+    """
+    Load an alternative engine from a module exposing `parse_blk_to_dict` and `parse_dict_to_blk`
+    with the same signatures as `package.parse`.
+
+    Args:
+        name (str): Module name, e.g. `package.fastparse`.
+
+    Returns:
+        tuple: parse function, serialize function
+    """
+    module = import_module(name)
+    return module.parse_blk_to_dict, module.parse_dict_to_blk
+
+def run(count: int = 1000, seed: int = 0, depth: int = 3, width: int = 8, engines: dict = None) -> dict:
+    """
+    Generate random documents and check that every engine round-trips them like the reference.
+
+    Document `i` is generated from seed `seed + i`, so a failure can be reproduced on its own.
+
+    Checks per document:
+        - the reference parser reads the generated text back into the generated block.
+        - serialising and parsing again gives the same block, and serialising that gives the same text.
+        - every other engine parses the text and serialises the block exactly like the reference.
+
+    Args:
+        count (int, optional): Number of documents. Defaults to 1000.
+        seed (int, optional): Seed of the first document. Defaults to 0.
+        depth (int, optional): Maximum nesting depth. Defaults to 3.
+        width (int, optional): Maximum number of elements per block. Defaults to 8.
+        engines (dict, optional): Alternative engines by name, as returned by `load_engine`. Defaults to None.
+
+    Returns:
+        dict: Number of documents, list of failures (seed, engine, check, message) and documents per second
+        for parsing and serialising, per engine. Only documents that were parsed or serialised without an
+        exception are timed.
+    """
+    engines = {"reference": reference_engine(), **(engines or {})}
+    timings = {name: {"parse": 0.0, "dump": 0.0} for name in engines}
+    timed = {name: {"parse": 0, "dump": 0} for name in engines}
+    failures = []
+
+    def time(engine, phase, f, *args):
+        start = perf_counter()
+        result = f(*args)
+        timings[engine][phase] += perf_counter() - start
+        timed[engine][phase] += 1
+        return result
+
+    def check(doc_seed, engine, name, ok, message=''):
+        if not ok:
+            failures.append((doc_seed, engine, name, message))
+        return ok
+
+    for doc_seed in range(seed, seed + count):
+        rng = Random(doc_seed)
+        block = random_block(rng, depth, width)
+        text = render_block(rng, block)
+
+        ref_parse, ref_dump = engines["reference"]
+        try:
+            parsed, _ = time("reference", "parse", ref_parse, text)
+            dumped = time("reference", "dump", ref_dump, parsed)
+        except Exception as e:
+            check(doc_seed, "reference", "round-trip", False, repr(e))
+            continue
+
+        check(doc_seed, "reference", "parse", same(parsed, block), text)
+        try:
+            reparsed, _ = ref_parse(dumped)
+            if check(doc_seed, "reference", "stable parse", same(reparsed, parsed), dumped):
+                check(doc_seed, "reference", "stable dump", ref_dump(reparsed) == dumped, dumped)
+        except Exception as e:
+            check(doc_seed, "reference", "stable parse", False, repr(e))
+
+        for engine, (parse, dump) in engines.items():
+            if engine == "reference":
+                continue
+            try:
+                result, _ = time(engine, "parse", parse, text)
+                check(doc_seed, engine, "parse", same(result, parsed), text)
+            except Exception as e:
+                check(doc_seed, engine, "parse", False, repr(e))
+            try:
+                result = time(engine, "dump", dump, parsed)
+                check(doc_seed, engine, "dump", result == dumped, result)
+            except Exception as e:
+                check(doc_seed, engine, "dump", False, repr(e))
+
+    throughput = {
+        name: {k: (timed[name][k] / v if v else float("inf")) if timed[name][k] else 0.0 for k, v in t.items()}
+        for name, t in timings.items()
+    }
+    return {"documents": count, "failures": failures, "throughput": throughput}
+
+def main(argv: list = None) -> int:
+    """
+    Command line entry point: `python -m package.fuzz [--count N] [--seed S] [--engine MODULE ...]`.
+
+    Args:
+        argv (list, optional): Command line arguments. Defaults to `sys.argv[1:]`.
+
+    Returns:
+        int: Exit code, 1 if any check failed.
+    """
+    parser = ArgumentParser(prog="python -m package.fuzz", description="Round-trip and differential fuzzing of the .blk parser.")
+    parser.add_argument("--count", type=int, default=1000, help="number of documents to generate")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first document")
+    parser.add_argument("--depth", type=int, default=3, help="maximum nesting depth")
+    parser.add_argument("--width", type=int, default=8, help="maximum number of elements per block")
+    parser.add_argument("--engine", action="append", default=[], metavar="MODULE", help="module to compare against package.parse")
+    args = parser.parse_args(argv)
+
+    engines = {name: load_engine(name) for name in args.engine}
+    report = run(args.count, args.seed, args.depth, args.width, engines)
+
+    for doc_seed, engine, name, message in report["failures"][:10]:
+        print(f"FAIL seed={doc_seed} engine={engine} check={name}\n{message}\n")
+    if len(report["failures"]) > 10:
+        print(f"... and {len(report['failures']) - 10} more failures")
+
+    print(f"{report['documents']} documents, {len(report['failures'])} failures")
+    for name, t in report["throughput"].items():
+        print(f"{name}: parse {t['parse']:.0f} docs/s, dump {t['dump']:.0f} docs/s")
+
+    return 1 if report["failures"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+from bisect import bisect_left, bisect_right
+from fnmatch import fnmatchcase
+from re import fullmatch
+import json
+import os
+
+NATIONS = {
+    "cn": "CHINA",
+    "fr": "FRANCE",
+    "germ": "GERMANY",
+    "il": "ISRAEL",
+    "it": "ITALY",
+    "jp": "JAPAN",
+    "sw": "SWEDEN",
+    "uk": "UNITED KINGDOM",
+    "us": "USA",
+    "ussr": "USSR_RUSSIA",
+}
+
+INDEX_VERSION = 2
+NO_CALIBER = -1.0
+ALL = "*"
+
+def nation_of(vehicle: str) -> str:
+    """
+    Find the nation of a vehicle from the prefix of its name.
+
+    Args:
+        vehicle (str): Vehicle name, e.g. `germ_pzkpfw_iv_ausf_h`.
+
+    Returns:
+        str: Nation name, or an empty string if the prefix is unknown.
+    """
+    prefix, sep, _ = vehicle.partition("_")
+    return NATIONS.get(prefix, "") if sep else ""
+
+def caliber_of(source_veh: dict) -> str:
+    """
+    Find the caliber of the main weapon of a vehicle, as used in its modification names.
+
+    Args:
+        source_veh (dict): The loaded vehicle .json data.
+
+    Returns:
+        str: Caliber such as `75mm` or `12_7mm`, or an empty string if none could be found.
+    """
+    try:
+        try:
+            caliber_source = source_veh["commonWeapons"]["Weapon"][0]["blk"][::-1]
+        except KeyError:
+            caliber_source = source_veh["commonWeapons"]["Weapon"]["blk"][::-1]
+        if not any(char.isdigit() for char in caliber_source):
+            return ""
+
+        caliber_chars = []
+        for char in caliber_source:
+            if char == "/":
+                break
+            else:
+                caliber_chars.append(char)
+
+        caliber = ""
+        caliber_chars = ''.join(caliber_chars)[::-1]
+        for char in caliber_chars:
+            if char == "_" and not caliber_chars[caliber_chars.index(char) + 1].isnumeric():
+                break
+            elif char == "_" and caliber_chars[caliber_chars.index(char) - 1].isalpha():
+                break
+            elif len(caliber) > 5:
+                break
+            else:
+                caliber += char
+        return caliber
+    except (KeyError, IndexError, TypeError):
+        return ""
+
+def caliber_mm(caliber: str) -> float | None:
+    """
+    Convert a caliber string into millimetres.
+
+    Args:
+        caliber (str): Caliber such as `75mm` or `12_7mm`.
+
+    Returns:
+        float | None: Caliber in millimetres, or None if the string is not a caliber.
+    """
+    m = fullmatch(r'(\d+)(?:_(\d+))?mm.*', caliber)
+    if not m:
+        return None
+    return float(f'{m[1]}.{m[2] or 0}')
+
+def vehicle_record(vehicle_dir: str, file: str) -> dict | None:
+    """
+    Read the metadata of a single vehicle file.
+
+    Args:
+        vehicle_dir (str): Directory holding the vehicle .json files.
+        file (str): Name of the vehicle file.
+
+    Returns:
+        dict | None: Vehicle record, or None if the file is not a vehicle .json file.
+    """
+    path = os.path.join(vehicle_dir, file)
+    stat = os.stat(path)
+    name = file.rsplit(".", 1)[0]
+    try:
+        with open(path, "r") as source_veh_json:
+            source_veh = json.load(source_veh_json)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+    try:
+        preset = bool(source_veh["weapon_presets"]["preset"]["name"])
+    except (KeyError, TypeError):
+        preset = False
+    caliber = caliber_of(source_veh)
+    mm = caliber_mm(caliber)
+
+    return {
+        "name": name,
+        "file": file,
+        "nation": nation_of(name),
+        "caliber": caliber,
+        "caliber_mm": NO_CALIBER if mm is None else mm,
+        "preset": preset,
+        "mtime": stat.st_mtime,
+        "size": stat.st_size,
+    }
+
+def build_index(vehicle_dir: str, previous: dict = None) -> dict:
+    """
+    Build the metadata index of every vehicle file in a directory.
+
+    Args:
+        vehicle_dir (str): Directory holding the vehicle .json files.
+        previous (dict, optional): Earlier index of the directory. Records of files whose mtime and size are unchanged are reused. Defaults to None.
+
+    Returns:
+        dict: Index with a record per vehicle and the vehicle names of each nation sorted by caliber.
+    """
+    known = {r["file"]: r for r in previous["vehicles"].values()} if previous else {}
+
+    vehicles = {}
+    for file in sorted(os.listdir(vehicle_dir)):
+        record = known.get(file)
+        stat = os.stat(os.path.join(vehicle_dir, file))
+        if record is None or record["mtime"] != stat.st_mtime or record["size"] != stat.st_size:
+            record = vehicle_record(vehicle_dir, file)
+        if record is not None:
+            vehicles[record["name"]] = record
+
+    nations = {ALL: []}
+    for name, record in vehicles.items():
+        nations[ALL].append(name)
+        nations.setdefault(record["nation"], []).append(name)
+
+    buckets = {}
+    for nation, names in nations.items():
+        names.sort(key=lambda n: vehicles[n]["caliber_mm"])
+        buckets[nation] = {"names": names, "calibers": [vehicles[n]["caliber_mm"] for n in names]}
+
+    return {"version": INDEX_VERSION, "vehicles": vehicles, "nations": buckets}
+
+def load_index(vehicle_dir: str) -> dict:
+    """
+    Load the metadata index of a vehicle directory, re-reading the vehicle files that were added or changed since it was built.
+
+    The index is stored next to the directory as `<directory>.index.json`. An unreadable index file is rebuilt.
+
+    Args:
+        vehicle_dir (str): Directory holding the vehicle .json files.
+
+    Returns:
+        dict: The vehicle index.
+    """
+    vehicle_dir = os.path.normpath(vehicle_dir)
+    index_file = vehicle_dir + ".index.json"
+
+    previous = None
+    if os.path.exists(index_file):
+        try:
+            with open(index_file, "r") as f:
+                previous = json.load(f)
+        except (ValueError, UnicodeDecodeError):
+            previous = None
+        if not isinstance(previous, dict) or previous.get("version") != INDEX_VERSION:
+            previous = None
+
+    index = build_index(vehicle_dir, previous)
+    if index != previous:
+        with open(index_file + ".tmp", "w") as f:
+            json.dump(index, f)
+        os.replace(index_file + ".tmp", index_file)
+    return index
+
+def parse_filter(expr: str) -> dict:
+    """
+    Parse a vehicle filter expression.
+
+    Terms are separated by whitespace and combined with AND, e.g. `nation=germ,ussr caliber=75-105 name=*tiger*`.
+
+    - `nation=`: comma separated nation prefixes or names.
+    - `caliber=`: caliber in millimetres, either exact (`88`) or a range (`75-105`, `100-`, `-50`).
+    - `name=`: glob matched against the vehicle name.
+    - `preset=`: `yes` or `no`, whether the vehicle has a weapon preset.
+
+    Args:
+        expr (str): Filter expression. An empty expression matches every vehicle.
+
+    Raises:
+        ValueError: Invalid term
+        ValueError: Unknown filter
+        ValueError: Unknown nation
+        ValueError: Invalid caliber range
+        ValueError: Unknown boolean value
+
+    Returns:
+        dict: Parsed filter.
+    """
+    result = {"nations": None, "caliber": None, "name": None, "preset": None}
+    for term in expr.split():
+        key, sep, value = term.partition("=")
+        if not sep or not value:
+            raise ValueError(f'Invalid term {term}')
+
+        match key.lower():
+            case 'nation':
+                nations = set()
+                for n in value.split(","):
+                    if n.lower() in NATIONS:
+                        nations.add(NATIONS[n.lower()])
+                    elif n.upper() in NATIONS.values():
+                        nations.add(n.upper())
+                    else:
+                        raise ValueError(f'Unknown nation {n}')
+                result["nations"] = nations
+            case 'caliber':
+                lo, sep, hi = value.partition("-")
+                try:
+                    lo = float(lo) if lo else 0.0
+                    hi = float(hi) if hi else float("inf") if sep else lo
+                except ValueError:
+                    raise ValueError(f'Invalid caliber range {value}')
+                if lo > hi:
+                    raise ValueError(f'Invalid caliber range {value}')
+                result["caliber"] = (lo, hi)
+            case 'name':
+                result["name"] = value.lower()
+            case 'preset':
+                if value not in ['yes', 'true', 'no', 'false']:
+                    raise ValueError(f'Unknown boolean value {value}')
+                result["preset"] = value in ['yes', 'true']
+            case _:
+                raise ValueError(f'Unknown filter {key}')
+    return result
+
+def select(index: dict, expr: str | dict = "") -> list:
+    """
+    Select the vehicles of an index matching a filter.
+
+    Only the nation buckets named by the filter are visited, and the caliber range is located by bisection,
+    so the cost grows with the number of candidates rather than the number of vehicles.
+
+    Args:
+        index (dict): The vehicle index.
+        expr (str | dict, optional): Filter expression or parsed filter. Defaults to every vehicle.
+
+    Returns:
+        list: The matching vehicle records, sorted by name.
+    """
+    f = parse_filter(expr) if isinstance(expr, str) else expr
+    vehicles = index["vehicles"]
+    buckets = index["nations"]
+
+    nations = [ALL] if f["nations"] is None else [n for n in f["nations"] if n in buckets]
+
+    result = []
+    for nation in nations:
+        names = buckets[nation]["names"]
+        if f["caliber"] is not None:
+            calibers = buckets[nation]["calibers"]
+            lo, hi = f["caliber"]
+            names = names[bisect_left(calibers, lo):bisect_right(calibers, hi)]
+
+        for name in names:
+            record = vehicles[name]
+            if f["name"] is not None and not fnmatchcase(name.lower(), f["name"]):
+                continue
+            if f["preset"] is not None and record["preset"] != f["preset"]:
+                continue
+            result.append(record)
+
+    result.sort(key=lambda r: r["name"])
+    return result
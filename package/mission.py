@@ -0,0 +1,172 @@
+import package.parse as blk_parser
+from package.streaming import CHUNK_SIZE, write_blk
+
+MODEL_TYPES = ["tankModels", "armada", "ships"]
+
+class Mission:
+    """
+    A War Thunder user mission, wrapping the list of tuples returned by `package.parse.parse_blk_to_dict`.
+
+    Paths are lists of keys and/or indices as used by `package.parse`, or a string of keys separated by `/`.
+    String paths can only hold keys: `"units/0"` looks up the key `"0"`, use `["units", 0]` for the first element.
+    A path that does not exist, including one that continues past a value, is treated as not found.
+    """
+    def __init__(self, data: list = None):
+        """
+        Args:
+            data (list, optional): The parsed .blk data. Defaults to an empty mission.
+        """
+        self.data = data if data is not None else []
+
+    @classmethod
+    def load(cls, path: str) -> "Mission":
+        """
+        Load a mission from a .blk file.
+
+        Args:
+            path (str): File to load.
+
+        Returns:
+            Mission: The parsed mission.
+        """
+        with open(path, "r") as f:
+            return cls.loads(f.read())
+
+    @classmethod
+    def loads(cls, text: str) -> "Mission":
+        """
+        Load a mission from a .blk-formatted string.
+
+        Args:
+            text (str): Data to parse.
+
+        Returns:
+            Mission: The parsed mission.
+        """
+        data, _ = blk_parser.parse_blk_to_dict(text)
+        return cls(data)
+
+    def get(self, path, default=None):
+        """
+        Find the value of the element specified by the path.
+
+        Args:
+            path: Path to the desired element.
+            default (optional): Value returned if the element is not found. Defaults to None.
+
+        Returns:
+            The value at the specified path or default if not found.
+        """
+        value = blk_parser.find_value_by_path(self.data, self._path(path))
+        return default if value is None else value
+
+    def set(self, path, value) -> "Mission":
+        """
+        Set the value of the element specified by the path. Elements that do not exist are left untouched.
+
+        Args:
+            path: Path to the desired element.
+            value: The new value.
+
+        Returns:
+            Mission: This mission.
+        """
+        blk_parser.modify_value_by_path(self.data, self._path(path), value)
+        return self
+
+    def player_unit(self) -> tuple:
+        """
+        Find the unit of the player.
+
+        Raises:
+            ValueError: No valid class of vehicles for the player
+            LookupError: No path to the player unit
+
+        Returns:
+            tuple: class of vehicles (one of MODEL_TYPES), path to the player unit
+        """
+        wing = self.get(["mission_settings", "player", "wing"])
+        for model_type in MODEL_TYPES:
+            unit_path = blk_parser.find_element_by_value(self.data, wing, model_type, path_is_index=True)
+            if unit_path is not None:
+                break
+        else:
+            raise ValueError(f'No valid class of vehicles for the player unit {wing}, expected one of {", ".join(MODEL_TYPES)}')
+
+        unit_path = blk_parser.closest_parent_by_path(self.data, unit_path)
+        if unit_path is None:
+            raise LookupError(f'No path to the player unit {wing}')
+        return model_type, unit_path
+
+    def snapshot(self, paths) -> dict:
+        """
+        Record the current values of elements, so they can be put back with `restore`.
+
+        Args:
+            paths: Iterable of paths. Elements that do not exist are not recorded.
+
+        Returns:
+            dict: The values by path.
+        """
+        values = {}
+        for path in paths:
+            value = self.get(path)
+            if value is not None:
+                values[tuple(self._path(path))] = value
+        return values
+
+    def restore(self, snapshot: dict) -> "Mission":
+        """
+        Put back the values recorded by `snapshot`.
+
+        Args:
+            snapshot (dict): The values by path.
+
+        Returns:
+            Mission: This mission.
+        """
+        for path, value in snapshot.items():
+            self.set(path, value)
+        return self
+
+    def variants(self, changes):
+        """
+        Apply each set of changes in turn and yield the mission after each of them.
+
+        Each set of changes is undone before the next one is applied, and when iteration stops.
+
+        Args:
+            changes: Iterable of dicts mapping paths (as tuples or strings) to new values.
+
+        Yields:
+            Mission: This mission, with the changes applied.
+        """
+        for change in changes:
+            original = self.snapshot(change)
+            try:
+                for path, value in change.items():
+                    self.set(path, value)
+                yield self
+            finally:
+                self.restore(original)
+
+    def dump(self, path: str, chunk_size: int = CHUNK_SIZE) -> None:
+        """
+        Write the mission to a .blk file in chunks.
+
+        Args:
+            path (str): File to write.
+            chunk_size (int, optional): Number of characters buffered before writing. Defaults to CHUNK_SIZE.
+        """
+        write_blk(path, self.data, chunk_size)
+
+    def dumps(self) -> str:
+        """
+        Returns:
+            str: The mission as a .blk-formatted string.
+        """
+        return blk_parser.parse_dict_to_blk(self.data)
+
+    @staticmethod
+    def _path(path) -> list:
+        return path.split("/") if isinstance(path, str) else list(path)
@@ -51,6 +51,27 @@ def parse_blk_to_dict(data: str, start: int = 0) -> (dict, int):
         m = m[1:-1]
         return [matrix(v) for v in findall(r'\[([^]]+)]', m)]
 
+    def convert(s: str):
+        match _type:
+            case 'i':
+                return int(s)
+            case 'r':
+                return float(s)
+            case 't':
+                return s
+            case 'b':
+                if s not in ['yes', 'true', 'no', 'false']:
+                    raise ValueError(f'Unknown boolean value {s}')
+                return s in ['yes', 'true']
+            case 'm':
+                return matrix(s)
+            case 'p2' | 'p3' | 'p4':
+                value = tuple(float(v) for v in s.split(','))
+                if (r := len(value)) != (e := int(_type[1])):
+                    raise ValueError(f'Expected {e} values, got {r}')
+                return value
+        return s
+
     state = States.ID_NEXT
     s = ''
     _id = ''
@@ -145,34 +166,18 @@ def parse_blk_to_dict(data: str, start: int = 0) -> (dict, int):
             case States.VALUE:
                 if ch in [';', '\n', '"']:
                     state = States.ID_NEXT
-                    value = s
-                    match _type:
-                        case 'i':
-                            value = int(s)
-                        case 'r':
-                            value = float(s)
-                        case 't':
-                            value = s
-                        case 'b':
-                            if s not in ['yes', 'true', 'no', 'false']:
-                                raise ValueError(f'Unknown boolean value {s}')
-                            value = s in ['yes', 'true']
-                        case 'm':
-                            value = matrix(s)
-                        case 'p2' | 'p3' | 'p4':
-                            value = tuple(float(v) for v in s.split(','))
-                            if (r := len(value)) != (e := int(_type[1])):
-                                raise ValueError(f'Expected {e} values, got {r}')
-                    result.append((_id, value))
+                    result.append((_id, convert(s)))
                 elif ch.isalnum() or ch.isspace() or ch in '_/"[].,+-':
                     s += ch
                 elif ch == '}':
-                    result.append((_id, s))
+                    result.append((_id, convert(s)))
                     return result, i + 1
                 else:
                     unexpected()
             case _:
                 raise SyntaxError(f'Unknown state {state}')
+    if state == States.VALUE:
+        result.append((_id, convert(s)))
     return result, len(data)
 
 
@@ -187,6 +192,19 @@ def parse_dict_to_blk(data, indent: int = 0) -> str:
     Returns:
         str: parsed string
     """
+    return '\n'.join(iter_dict_to_blk(data, indent))
+
+def iter_dict_to_blk(data, indent: int = 0):
+    """
+    Lazily parses a list of tuples into the lines of a .blk-formatted string, so that large missions can be written without building the whole string.
+
+    Args:
+        data: Data to parse
+        indent (int, optional): Default indentation. Defaults to 0.
+
+    Yields:
+        str: parsed lines, without line endings
+    """
     def serialize_value(value):
         if isinstance(value, bool):
             return f'b={"yes" if value else "no"}'
@@ -208,27 +226,25 @@ def parse_dict_to_blk(data, indent: int = 0) -> str:
             else:
                 return [serialize_value(item) for item in value]
         elif isinstance(value, list) and all(isinstance(i, tuple) and len(i) == 2 for i in value):
-            return serialize_dict(value, indent + 1)
+            return '\n'.join(serialize_dict(value, indent + 1))
         elif isinstance(value, dict):
-            return serialize_dict(value, 1)  # Serialize nested dictionary
+            return '\n'.join(serialize_dict(value, 1))  # Serialize nested dictionary
         else:
             raise ValueError(f'Unknown type {type(value)} for value {value}')
 
     def serialize_dict(d, level):
         indent_str = ' ' * (level * 2)
-        lines = []
         for key, value in d:
             if isinstance(value, list) and all(isinstance(i, tuple) and len(i) == 2 for i in value):
-                lines.append(f'{indent_str}{key}{{')
-                lines.append(serialize_dict(value, level + 1))
-                lines.append(f'{indent_str}}}')
+                yield f'{indent_str}{key}{{'
+                yield from serialize_dict(value, level + 1) if value else ['']
+                yield f'{indent_str}}}'
             elif isinstance(value, dict):
-                lines.append(f'{indent_str}{key}{{')
-                lines.append(serialize_dict(value.items(), level + 1))
-                lines.append(f'{indent_str}}}')
+                yield f'{indent_str}{key}{{'
+                yield from serialize_dict(value.items(), level + 1) if value else ['']
+                yield f'{indent_str}}}'
             else:
-                lines.append(f'{indent_str}{key}:{serialize_value(value)}')
-        return '\n'.join(lines)
+                yield f'{indent_str}{key}:{serialize_value(value)}'
 
     return serialize_dict(data, indent)
 
@@ -321,16 +337,18 @@ def find_value_by_path(data, path):
         The value at the specified path or None if not found.
     """
     for key in path:
+        if not isinstance(data, list):
+            return None  # Path continues past a value
         if isinstance(key, int):  # Use index to specify element.
-            if isinstance(data, list) and 0 <= key < len(data):
+            if 0 <= key < len(data) and isinstance(data[key], tuple):
                 data = data[key][1]
             else:
                 return None
         else:
             found = False
-            for k, v in data:
-                if k == key:
-                    data = v
+            for element in data:
+                if isinstance(element, tuple) and element[0] == key:
+                    data = element[1]
                     found = True
                     break
             if not found:
@@ -400,14 +418,19 @@ def modify_value_by_path(data, path, new_value):
 
     target = data
     for key in sub_path:
+        if not isinstance(target, list):
+            return data  # Path continues past a value
         if isinstance(key, int):
-            if isinstance(target, list) and 0 <= key < len(target):
+            if 0 <= key < len(target) and isinstance(target[key], tuple):
                 target = target[key][1]
             else:
                 return data
         else:
             found = False
-            for k, v in target:
+            for element in target:
+                if not isinstance(element, tuple):
+                    continue
+                k, v = element
                 if k == key:
                     if isinstance(v, list) and all(isinstance(i, tuple) for i in v):
                         target = v
@@ -420,13 +443,15 @@ def modify_value_by_path(data, path, new_value):
             if not found:
                 return data
 
+    if not isinstance(target, list):
+        return data  # Path continues past a value
     if isinstance(final_key, int):
-        if isinstance(target, list) and 0 <= final_key < len(target):
+        if 0 <= final_key < len(target) and isinstance(target[final_key], tuple):
             target[final_key] = (target[final_key][0], new_value)
     else:
-        for idx, (k, v) in enumerate(target):
-            if k == final_key:
-                target[idx] = (k, new_value)
+        for idx, element in enumerate(target):
+            if isinstance(element, tuple) and element[0] == final_key:
+                target[idx] = (final_key, new_value)
                 break
 
     return data
@@ -0,0 +1,118 @@
+import json
+import os
+import tracemalloc
+
+import package.parse as blk_parser
+
+BATCH_SIZE = 64
+CHUNK_SIZE = 1024 * 1024
+MIN_CHUNK_SIZE = 4 * 1024
+
+def ammo_types_of(source_veh: dict, caliber: str) -> list:
+    """
+    Find up to four ammunition modifications matching the caliber of a vehicle.
+
+    Args:
+        source_veh (dict): The loaded vehicle .json data.
+        caliber (str): Caliber of the main weapon, as returned by `package.index.caliber_of`.
+
+    Returns:
+        list: Names of the ammunition modifications.
+    """
+    ammo_types = []
+    for k, v in source_veh.get("modifications", {}).items():
+        if caliber in k and "ammo_pack" not in k and len(ammo_types) < 4:
+            ammo_types.append(k)
+        elif caliber in ["12_7mm", "13_2mm"] and "ammo_pack" not in k and len(ammo_types) < 4:
+            if caliber[0:2] in k:
+                ammo_types.append(k)
+        elif caliber in ["7_62mm", "7_92mm"] and "ammo_pack" not in k and len(ammo_types) < 4:
+            if caliber[0:1] in k:
+                ammo_types.append(k)
+    return ammo_types
+
+def vehicle_fields(source_veh: dict, caliber: str) -> dict:
+    """
+    Extract the fields needed to patch a mission from a vehicle, so the rest of its data can be released.
+
+    Args:
+        source_veh (dict): The loaded vehicle .json data.
+        caliber (str): Caliber of the main weapon, or an empty string if unknown.
+
+    Returns:
+        dict: Name of the weapon preset (None if there is none) and the ammunition modifications.
+    """
+    try:
+        weapon = source_veh["weapon_presets"]["preset"]["name"]
+    except (KeyError, TypeError):
+        weapon = None
+
+    return {"weapon": weapon, "ammo_types": ammo_types_of(source_veh, caliber) if caliber else []}
+
+def budget_chunk_size(memory_budget: int) -> int:
+    """
+    Derive the write chunk size from a memory budget: a 64th of the budget, between MIN_CHUNK_SIZE and CHUNK_SIZE.
+
+    Args:
+        memory_budget (int): Memory budget in bytes.
+
+    Returns:
+        int: Number of characters buffered before writing.
+    """
+    return max(MIN_CHUNK_SIZE, min(CHUNK_SIZE, memory_budget // 64))
+
+def iter_vehicle_fields(vehicle_dir: str, records: list, batch_size: int = BATCH_SIZE, memory_budget: int = None):
+    """
+    Stream the fields of the given vehicles, loading their .json files in batches.
+
+    Each .json file is released as soon as its fields are extracted, so at most one vehicle is fully loaded at a time.
+
+    Args:
+        vehicle_dir (str): Directory holding the vehicle .json files.
+        records (list): Vehicle records, as returned by `package.index.select`.
+        batch_size (int, optional): Number of vehicles read ahead per batch. Only their small field dicts are kept, so this does not affect peak memory. Defaults to BATCH_SIZE.
+        memory_budget (int, optional): Memory budget in bytes. If tracemalloc is tracing, the peak traced memory is compared against it after each vehicle is loaded. Defaults to None.
+
+    Raises:
+        MemoryError: Memory budget exceeded
+
+    Yields:
+        tuple: vehicle record, vehicle fields
+    """
+    for start in range(0, len(records), batch_size):
+        batch = []
+        for record in records[start:start + batch_size]:
+            with open(os.path.join(vehicle_dir, record["file"]), "r") as source_veh_json:
+                source_veh = json.load(source_veh_json)
+            if memory_budget is not None and tracemalloc.is_tracing():
+                _, peak = tracemalloc.get_traced_memory()
+                if peak > memory_budget:
+                    raise MemoryError(f'Memory budget of {memory_budget / 1024 ** 2:.1f} MB exceeded while loading {record["file"]} ({peak / 1024 ** 2:.1f} MB peak)')
+            batch.append((record, vehicle_fields(source_veh, record["caliber"])))
+            del source_veh
+        yield from batch
+
+def write_blk(path: str, data, chunk_size: int = CHUNK_SIZE) -> None:
+    """
+    Write a list of tuples as a .blk file in chunks, without building the whole string.
+
+    The file content is identical to `package.parse.parse_dict_to_blk`.
+
+    Args:
+        path (str): File to write.
+        data: The list of tuples representing the parsed .blk data.
+        chunk_size (int, optional): Number of characters buffered before writing. Defaults to CHUNK_SIZE.
+    """
+    with open(path, "w") as f:
+        chunk = []
+        size = 0
+        for i, line in enumerate(blk_parser.iter_dict_to_blk(data)):
+            if i:
+                chunk.append('\n')
+            chunk.append(line)
+            size += len(line) + 1
+            if size >= chunk_size:
+                f.write(''.join(chunk))
+                chunk.clear()
+                size = 0
+        f.write(''.join(chunk))
@@ -0,0 +1,127 @@
+from tempfile import TemporaryDirectory
+import json
+import os
+import unittest
+
+import package.index as blk_index
+
+VEHICLES = {
+    "germ_tiger_e": "88mm_kwk36",
+    "germ_pzkpfw_ii_ausf_c": "20mm_kwk30",
+    "ussr_t_34_85_zis_53": "85mm_zis_s_53",
+    "ussr_is_2_1944": "122mm_d25t",
+    "us_m2a2": "12_7mm_m2hb",
+    "it_m13_40": "47mm_cannone_da_47_32",
+}
+
+def vehicle_json(weapon: str) -> dict:
+    return {
+        "commonWeapons": {"Weapon": [{"blk": f"gameData/Weapons/groundModels_weapons/{weapon}_user_cannon.blk"}]},
+        "weapon_presets": {"preset": {"name": "default"}},
+    }
+
+class IndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.vehicle_dir = os.path.join(self.tmp.name, "tankModels")
+        os.makedirs(self.vehicle_dir)
+        for name, weapon in VEHICLES.items():
+            self.write(name, vehicle_json(weapon))
+        self.write("uk_no_gun", {"weapon_presets": {"preset": {"name": "default"}}})
+        self.write("jp_empty_weapons", {"commonWeapons": {"Weapon": []}})
+        self.write("fr_trailing", {"commonWeapons": {"Weapon": {"blk": "gameData/Weapons/75mm_"}}})
+        self.index = blk_index.load_index(self.vehicle_dir)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name: str, data: dict):
+        with open(os.path.join(self.vehicle_dir, f"{name}.json"), "w") as f:
+            json.dump(data, f)
+
+    def names(self, expr: str) -> list:
+        return [r["name"] for r in blk_index.select(self.index, expr)]
+
+    def test_records(self):
+        record = self.index["vehicles"]["us_m2a2"]
+        self.assertEqual(record["nation"], "USA")
+        self.assertEqual(record["caliber"], "12_7mm")
+        self.assertEqual(record["caliber_mm"], 12.7)
+        self.assertTrue(record["preset"])
+        self.assertEqual(record["file"], "us_m2a2.json")
+
+    def test_unusual_vehicles(self):
+        self.assertEqual(self.index["vehicles"]["uk_no_gun"]["caliber"], "")
+        self.assertEqual(self.index["vehicles"]["jp_empty_weapons"]["caliber"], "")
+        self.assertFalse(self.index["vehicles"]["jp_empty_weapons"]["preset"])
+        self.assertEqual(self.index["vehicles"]["fr_trailing"]["caliber"], "")
+
+    def test_caliber_of(self):
+        self.assertEqual(blk_index.caliber_of({"commonWeapons": {"Weapon": {"blk": "a/75mm_kwk40_user_cannon.blk"}}}), "75mm")
+        self.assertEqual(blk_index.caliber_of({"commonWeapons": "none"}), "")
+        self.assertEqual(blk_index.caliber_of({"commonWeapons": {"Weapon": [{"blk": "a/75mm_"}]}}), "")
+
+    def test_exact_caliber(self):
+        self.assertEqual(self.names("caliber=12.7"), ["us_m2a2"])
+        self.assertEqual(self.names("caliber=88"), ["germ_tiger_e"])
+        self.assertEqual(self.names("caliber=12"), [])
+
+    def test_caliber_ranges(self):
+        self.assertEqual(self.names("caliber=85-88"), ["germ_tiger_e", "ussr_t_34_85_zis_53"])
+        self.assertEqual(self.names("caliber=100-"), ["ussr_is_2_1944"])
+        self.assertEqual(self.names("caliber=-50"), ["germ_pzkpfw_ii_ausf_c", "it_m13_40", "us_m2a2"])
+
+    def test_no_caliber_excluded(self):
+        names = self.names("caliber=0-")
+        self.assertNotIn("uk_no_gun", names)
+        self.assertNotIn("jp_empty_weapons", names)
+        self.assertEqual(len(names), len(VEHICLES))
+        self.assertIn("uk_no_gun", self.names(""))
+
+    def test_nation_and_name(self):
+        self.assertEqual(self.names("nation=germ"), ["germ_pzkpfw_ii_ausf_c", "germ_tiger_e"])
+        self.assertEqual(self.names("nation=ussr,us caliber=-90"), ["us_m2a2", "ussr_t_34_85_zis_53"])
+        self.assertEqual(self.names("nation=USSR_RUSSIA name=*IS_2*"), ["ussr_is_2_1944"])
+        self.assertEqual(self.names("preset=no"), ["fr_trailing", "jp_empty_weapons"])
+
+    def test_invalid_filters(self):
+        for expr in ["nation=xx", "foo=1", "caliber=9-3", "caliber=abc", "preset=maybe", "nation"]:
+            with self.assertRaises(ValueError):
+                blk_index.parse_filter(expr)
+
+    def test_reload(self):
+        index_file = self.vehicle_dir + ".index.json"
+        self.assertTrue(os.path.exists(index_file))
+        reloaded = blk_index.load_index(self.vehicle_dir)
+        self.assertEqual(reloaded, self.index)
+        self.assertEqual([r["name"] for r in blk_index.select(reloaded, "caliber=12.7")], ["us_m2a2"])
+
+    def test_reload_corrupt_index(self):
+        index_file = self.vehicle_dir + ".index.json"
+        for content in ["{bad", "[]", ""]:
+            with open(index_file, "w") as f:
+                f.write(content)
+            reloaded = blk_index.load_index(self.vehicle_dir)
+            self.assertEqual(reloaded, self.index)
+            with open(index_file, "r") as f:
+                self.assertEqual(json.load(f), self.index)
+        self.assertFalse(os.path.exists(index_file + ".tmp"))
+
+    def test_reload_changed_file(self):
+        path = os.path.join(self.vehicle_dir, "us_m2a2.json")
+        self.write("us_m2a2", vehicle_json("105mm_m68"))
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+        reloaded = blk_index.load_index(self.vehicle_dir)
+        self.assertEqual(reloaded["vehicles"]["us_m2a2"]["caliber"], "105mm")
+        self.assertEqual([r["name"] for r in blk_index.select(reloaded, "caliber=100-")], ["us_m2a2", "ussr_is_2_1944"])
+
+    def test_reload_removed_file(self):
+        os.remove(os.path.join(self.vehicle_dir, "germ_tiger_e.json"))
+        reloaded = blk_index.load_index(self.vehicle_dir)
+        self.assertNotIn("germ_tiger_e", reloaded["vehicles"])
+        self.assertEqual([r["name"] for r in blk_index.select(reloaded, "nation=germ")], ["germ_pzkpfw_ii_ausf_c"])
+
+if __name__ == "__main__":
+    unittest.main()
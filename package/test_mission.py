@@ -0,0 +1,135 @@
+from tempfile import TemporaryDirectory
+import json
+import os
+import unittest
+
+from package import Mission, Expander
+
+MISSION = """mission_settings{
+  player{
+    army:i=1
+    wing:t="armor_01"
+  }
+  mission{
+    type:t="singleMission"
+    locName:t="Test"
+  }
+}
+units{
+  tankModels{
+    name:t="armor_01"
+    tm:m=[[1, 0, 0] [0, 1, 0] [0, 0, 1] [10, 0, 20]]
+    unit_class:t="us_m4a2"
+    weapons:t="us_m4a2_default"
+    bullets0:t="75mm_us_m61"
+    bullets1:t="75mm_us_m48"
+    bullets2:t=""
+    bullets3:t=""
+    bulletsCount0:i=40
+    bulletsCount1:i=20
+    bulletsCount2:i=0
+    bulletsCount3:i=0
+  }
+}"""
+
+VEHICLES = {
+    "germ_tiger_e": {
+        "commonWeapons": {"Weapon": [{"blk": "gameData/Weapons/groundModels_weapons/88mm_kwk36_user_cannon.blk"}]},
+        "weapon_presets": {"preset": {"name": "germ_tiger_e_default"}},
+        "modifications": {"88mm_ger_kwk36_pzgr_39": {}, "88mm_ger_kwk36_sprgr": {}, "88mm_ammo_pack": {}},
+    },
+    "uk_no_gun": {"weapon_presets": {"preset": {"name": "uk_no_gun_default"}}},
+    "jp_no_preset": {"commonWeapons": {"Weapon": [{"blk": "gameData/Weapons/57mm_type97_user_cannon.blk"}]}},
+}
+
+class MissionTest(unittest.TestCase):
+    def setUp(self):
+        self.mission = Mission.loads(MISSION)
+
+    def test_get_set(self):
+        self.assertEqual(self.mission.get("units/tankModels/weapons"), "us_m4a2_default")
+        self.assertEqual(self.mission.get(["units", 0, 0]), "armor_01")
+        self.mission.set("units/tankModels/weapons", "changed")
+        self.assertEqual(self.mission.get("units/tankModels/weapons"), "changed")
+
+    def test_missing_paths(self):
+        text = self.mission.dumps()
+        for path in ["units/tankModels/name/x", "units/tankModels/tm/x", "units/0", ["units", 0, 0, 0], ["units", 5]]:
+            self.assertEqual(self.mission.get(path, "default"), "default")
+            self.mission.set(path, "changed")
+        self.assertEqual(self.mission.dumps(), text)
+
+    def test_player_unit(self):
+        self.assertEqual(self.mission.player_unit(), ("tankModels", [1, 0]))
+        self.mission.set("mission_settings/player/wing", "armor_02")
+        with self.assertRaises(ValueError):
+            self.mission.player_unit()
+
+    def test_variants_restore(self):
+        text = self.mission.dumps()
+        variants = self.mission.variants([{"units/tankModels/weapons": "a"}, {"units/tankModels/weapons": "b"}])
+        self.assertEqual(next(variants).get("units/tankModels/weapons"), "a")
+        variants.close()
+        self.assertEqual(self.mission.dumps(), text)
+
+class ExpanderTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.data_dir = os.path.join(self.tmp.name, "vehicles")
+        os.makedirs(os.path.join(self.data_dir, "tankModels"))
+        for name, data in VEHICLES.items():
+            with open(os.path.join(self.data_dir, "tankModels", f"{name}.json"), "w") as f:
+                json.dump(data, f)
+        self.mission = Mission.loads(MISSION)
+        self.expander = Expander(self.mission, self.data_dir)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def variants(self) -> dict:
+        return {name: Mission.loads(mission.dumps()) for name, mission in self.expander.variants()}
+
+    def test_variants(self):
+        variants = self.variants()
+        self.assertEqual(sorted(variants), ["GERMANY germ_tiger_e Test.blk", "UNITED KINGDOM uk_no_gun Test.blk"])
+
+        tiger = variants["GERMANY germ_tiger_e Test.blk"]
+        self.assertEqual(tiger.get("units/tankModels/unit_class"), "germ_tiger_e")
+        self.assertEqual(tiger.get("units/tankModels/weapons"), "germ_tiger_e_default")
+        self.assertEqual(tiger.get("units/tankModels/bullets0"), "88mm_ger_kwk36_pzgr_39")
+        self.assertEqual(tiger.get("units/tankModels/bullets1"), "88mm_ger_kwk36_sprgr")
+        self.assertEqual(tiger.get("units/tankModels/bullets2"), "")
+        self.assertEqual(tiger.get("mission_settings/mission/locName"), "GERMANY germ_tiger_e Test.blk")
+
+    def test_no_caliber_keeps_bullets(self):
+        no_gun = self.variants()["UNITED KINGDOM uk_no_gun Test.blk"]
+        self.assertEqual(no_gun.get("units/tankModels/weapons"), "uk_no_gun_default")
+        self.assertEqual(no_gun.get("units/tankModels/bullets0"), "75mm_us_m61")
+        self.assertEqual(no_gun.get("units/tankModels/bullets1"), "75mm_us_m48")
+
+    def test_no_preset_skipped(self):
+        messages = []
+        self.expander.log = messages.append
+        self.assertNotIn("JAPAN jp_no_preset Test.blk", self.variants())
+        self.assertTrue(any("jp_no_preset" in m for m in messages))
+
+    def test_expand_restores_mission(self):
+        text = self.mission.dumps()
+        export_dir = os.path.join(self.tmp.name, "export")
+        paths = self.expander.expand(export_dir, "nation=germ")
+        self.assertEqual(paths, [os.path.join(export_dir, "GERMANY germ_tiger_e Test.blk")])
+        self.assertEqual(self.mission.dumps(), text)
+
+        written = Mission.load(paths[0])
+        self.assertEqual(written.get("units/tankModels/unit_class"), "germ_tiger_e")
+
+    def test_variants_restore_on_close(self):
+        text = self.mission.dumps()
+        variants = self.expander.variants()
+        _, mission = next(variants)
+        self.assertNotEqual(mission.dumps(), text)
+        variants.close()
+        self.assertEqual(self.mission.dumps(), text)
+
+if __name__ == "__main__":
+    unittest.main()
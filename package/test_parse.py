@@ -0,0 +1,27 @@
+import unittest
+
+import package.fuzz as fuzz
+import package.parse as blk_parser
+
+class ParseTest(unittest.TestCase):
+    def test_value_at_end_of_input(self):
+        self.assertEqual(blk_parser.parse_blk_to_dict('x:i=1'), ([('x', 1)], 5))
+        self.assertEqual(blk_parser.parse_blk_to_dict('a{\n}\nb:p2=1,2')[0], [('a', []), ('b', (1.0, 2.0))])
+
+    def test_value_closed_by_block(self):
+        self.assertEqual(blk_parser.parse_blk_to_dict('a{x:i=1}')[0], [('a', [('x', 1)])])
+        self.assertEqual(blk_parser.parse_blk_to_dict('a{x:b=yes}')[0], [('a', [('x', True)])])
+        self.assertEqual(blk_parser.parse_blk_to_dict('a{x:r=1.5;y:m=[[1,2,3]]}')[0], [('a', [('x', 1.5), ('y', [[1.0, 2.0, 3.0]])])])
+
+    def test_round_trip(self):
+        data = [('a', [('x', 1), ('y', 2.5), ('s', 'text'), ('b', False), ('p', (1.0, 2.0, 3.0)), ('e', [])]), ('z', 3)]
+        text = blk_parser.parse_dict_to_blk(data)
+        self.assertTrue(fuzz.same(blk_parser.parse_blk_to_dict(text)[0], data))
+
+    def test_fuzz(self):
+        report = fuzz.run(count=200)
+        self.assertEqual(report["failures"], [])
+        self.assertEqual(report["documents"], 200)
+
+if __name__ == "__main__":
+    unittest.main()
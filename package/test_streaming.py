@@ -0,0 +1,69 @@
+from random import Random
+from tempfile import TemporaryDirectory
+import json
+import os
+import tracemalloc
+import unittest
+
+import package.fuzz as fuzz
+import package.parse as blk_parser
+import package.streaming as blk_streaming
+
+class StreamingTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+
+    def tearDown(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.tmp.cleanup()
+
+    def write_vehicle(self, name: str, size: int = 0) -> dict:
+        with open(os.path.join(self.tmp.name, f"{name}.json"), "w") as f:
+            json.dump({
+                "weapon_presets": {"preset": {"name": f"{name}_default"}},
+                "modifications": {"88mm_pzgr39": {}, "88mm_sprgr": {}, "88mm_ammo_pack": {}},
+                "padding": "x" * size,
+            }, f)
+        return {"name": name, "file": f"{name}.json", "caliber": "88mm"}
+
+    def test_write_blk_matches_serializer(self):
+        path = os.path.join(self.tmp.name, "mission.blk")
+        for seed in range(200):
+            data = fuzz.random_block(Random(seed))
+            expected = blk_parser.parse_dict_to_blk(data)
+            for chunk_size in [1, 7, blk_streaming.CHUNK_SIZE]:
+                blk_streaming.write_blk(path, data, chunk_size)
+                with open(path, "r", newline="") as f:
+                    self.assertEqual(f.read(), expected, (seed, chunk_size))
+
+    def test_budget_chunk_size(self):
+        self.assertEqual(blk_streaming.budget_chunk_size(1), blk_streaming.MIN_CHUNK_SIZE)
+        self.assertEqual(blk_streaming.budget_chunk_size(16 * 1024 ** 2), 256 * 1024)
+        self.assertEqual(blk_streaming.budget_chunk_size(10 * 1024 ** 3), blk_streaming.CHUNK_SIZE)
+
+    def test_vehicle_fields(self):
+        records = [self.write_vehicle("germ_tiger_e"), self.write_vehicle("germ_tiger_h1")]
+        fields = list(blk_streaming.iter_vehicle_fields(self.tmp.name, records, batch_size=1))
+        self.assertEqual([r["name"] for r, _ in fields], ["germ_tiger_e", "germ_tiger_h1"])
+        self.assertEqual(fields[0][1], {"weapon": "germ_tiger_e_default", "ammo_types": ["88mm_pzgr39", "88mm_sprgr"]})
+
+    def test_memory_budget_exceeded(self):
+        records = [self.write_vehicle("germ_tiger_e", size=1024 ** 2)]
+        tracemalloc.start()
+        with self.assertRaises(MemoryError):
+            list(blk_streaming.iter_vehicle_fields(self.tmp.name, records, memory_budget=512 * 1024))
+
+    def test_memory_budget_respected(self):
+        records = [self.write_vehicle("germ_tiger_e", size=1024)]
+        tracemalloc.start()
+        fields = list(blk_streaming.iter_vehicle_fields(self.tmp.name, records, memory_budget=64 * 1024 ** 2))
+        self.assertEqual(len(fields), 1)
+
+    def test_memory_budget_without_tracing(self):
+        records = [self.write_vehicle("germ_tiger_e", size=1024 ** 2)]
+        fields = list(blk_streaming.iter_vehicle_fields(self.tmp.name, records, memory_budget=1))
+        self.assertEqual(len(fields), 1)
+
+if __name__ == "__main__":
+    unittest.main()